@@ -9,7 +9,7 @@ from docx.enum.text import WD_ALIGN_PARAGRAPH, WD_BREAK
 from docx.enum.table import WD_ALIGN_VERTICAL # For vertical alignment in cells
 
 # Import cleanup functions with specific names to avoid confusion
-from photo_processor import cleanup_temp_files as cleanup_photo_temp_files
+from photo_processor import ensure_image_file, prepare_image_files, cleanup_temp_files as cleanup_photo_temp_files
 from map_generator import generate_map_image, generate_compass_indicator, cleanup_temp_files as cleanup_map_temp_files
 
 # Removed the problematic set_cell_margins function
@@ -76,6 +76,8 @@ def create_document(photo_data_list, output_path, images_per_page=2, include_loc
 
         # --- Photo Entries ---
         total_photos = len(photo_data_list)
+        # Convert all HEIC photos in parallel now rather than one by one as they are added below
+        prepare_image_files(photo_data_list)
         for i, photo_data in enumerate(photo_data_list):
             print(f"\nAdding Photo {i+1} of {total_photos}: {photo_data['filename']}")
 
@@ -87,8 +89,8 @@ def create_document(photo_data_list, output_path, images_per_page=2, include_loc
                  print("  Added Page Break.")
 
             # --- Image Insertion ---
-            # Use the temporary converted file if it exists, otherwise use original path
-            image_path = photo_data.get('temp_file') or photo_data['path']
+            # Use the temporary converted file (HEIC photos are converted here, on first use), otherwise the original path
+            image_path = ensure_image_file(photo_data)
             if not image_path or not os.path.exists(image_path):
                  print(f"  ERROR: Image file not found for {photo_data['filename']} at path: {image_path}")
                  # Add an error note in the document
@@ -2,11 +2,18 @@
 Photo Appendix Generator - Main Application Entry Point
 This script starts the GUI application.
 """
-import tkinter as tk
-from app_gui import PhotoAppendixApp
+import multiprocessing
 
 def main():
     """Main entry point for the application."""
+    # Imported here rather than at module level: process pool workers re-import this module
+    # (as __mp_main__) under spawn, and must not load the GUI or reconfigure logging
+    import logging
+    import tkinter as tk
+    # Configure logging before app_gui imports photo_processor, which logs at import time
+    logging.basicConfig(level=logging.INFO, format='%(levelname)s %(name)s: %(message)s')
+    from app_gui import PhotoAppendixApp
+
     # Create the main application window
     root = tk.Tk()
     root.title("Photo Appendix Generator")
@@ -19,4 +26,6 @@ def main():
     root.mainloop()
 
 if __name__ == "__main__":
+    # Required for the photo_processor worker pool in frozen (PyInstaller) builds
+    multiprocessing.freeze_support()
     main()
\ No newline at end of file
@@ -3,76 +3,252 @@ Photo Appendix Generator - Photo Processing Module
 This module handles reading photos and extracting metadata.
 """
 import os
-import exifread
+import atexit
+import functools
+import threading
 from PIL import Image, ExifTags # Import ExifTags for orientation handling
 import re
 import tempfile
 import shutil
 import subprocess
-import json
+import logging
+import pickle
+import plistlib
+import sqlite3
+import struct
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
 from datetime import datetime
-from fractions import Fraction
+from xml.parsers.expat import ExpatError
 import warnings
 
-# Suppress specific warnings from exifread if they become noisy
-warnings.filterwarnings("ignore", category=UserWarning, module='exifread')
+logger = logging.getLogger(__name__)
+
+# Platform probes; these never change while the process runs
+_IS_WIN = os.name == 'nt'
+_HAS_MDLS = shutil.which('mdls') is not None
+_HEIC_SUFFIXES = ('.heic', '.heif')
+
+# Set PHOTO_DEBUG=1 to log per-field metadata diagnostics for every photo
+DEBUG_METADATA = os.environ.get('PHOTO_DEBUG') == '1'
+if DEBUG_METADATA: logger.setLevel(logging.DEBUG)
+
+# Suppress specific warnings from Pillow's EXIF parser if they become noisy
+warnings.filterwarnings("ignore", category=UserWarning, module='PIL')
 
 # Try to import pillow_heif for HEIC support
 try:
-    from pillow_heif import register_heif_opener
-    register_heif_opener()
+    import pillow_heif
+    pillow_heif.register_heif_opener()
     HEIC_SUPPORT = True
-    print("pillow-heif found. HEIC support enabled.")
+    logger.info('pillow-heif found. HEIC support enabled.')
 except ImportError:
     HEIC_SUPPORT = False
-    print("Warning: pillow-heif not installed. HEIC support may be limited or require conversion.")
+    logger.warning('pillow-heif not installed. HEIC support may be limited or require conversion.')
+
+# Patterns used for every photo, compiled once
+_AAE_ADJUSTMENT_DESC_RE = re.compile(r'<key>adjustmentDescription</key>\s*<string>([^<]+)</string>')
+_AAE_DESC_RE = re.compile(r'<string name="description">([^<]+)</string>')
+_GPS_NON_NUMERIC_RE = re.compile(r'[^\d\.\s-]')
+_LEADING_NUMBER_RE = re.compile(r"^[+-]?(\d+(\.\d*)?|\.\d+)")
+# One 'name = value' line of mdls output; quoted strings are captured without their quotes
+_MDLS_LINE_RE = re.compile(r'^\s*(\w+)\s*= (?:"(.*)"|(.*?))\s*$', re.MULTILINE)
+_FILENAME_PREFIX_RE = re.compile(r'^(IMG|DSC|VID|PXL|Screenshot|Screen Shot)[\s_-]*', re.IGNORECASE)
+_FILENAME_SEPARATOR_RE = re.compile(r'[_ -]+')
+_FILENAME_DATETIME_RE = re.compile(r'(\d{4})(\d{2})(\d{2})[\s_-]*(\d{2})(\d{2})(\d{2})')
+
+# orjson parses ExifTool's JSON several times faster than the stdlib when it's installed; same loads() API
+try:
+    import orjson as _json
+except ImportError:
+    import json as _json
+
+# Use pyexiftool's stay_open wrapper when installed; otherwise ExifToolServer drives the daemon itself
+try:
+    from exiftool import ExifToolHelper
+    PYEXIFTOOL_SUPPORT = True
+except ImportError:
+    PYEXIFTOOL_SUPPORT = False
+
+# Largest stdout/stderr we keep from a helper command; a pathological file shouldn't balloon memory
+_MAX_SUBPROCESS_OUTPUT = 4 << 20
+
+def _run_bounded(cmd, max_bytes=_MAX_SUBPROCESS_OUTPUT, capture_stderr=True):
+    """Runs cmd like subprocess.run(capture_output=True, text=True), but reads at most max_bytes
+    from each stream and kills the process if it produces more. With capture_stderr=False, stderr
+    goes to DEVNULL (no pipe, no reader thread) and the result's stderr is None."""
+    with subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE if capture_stderr else subprocess.DEVNULL) as process:
+        output = {'stderr': None}
+        def read(name, stream):
+            data = stream.read(max_bytes + 1)
+            if len(data) > max_bytes:
+                logger.warning("Output of '%s' exceeded %s bytes; truncating.", cmd[0], max_bytes)
+                process.kill(); stream.close(); data = data[:max_bytes]
+            output[name] = data.decode('utf-8', errors='replace')
+        if capture_stderr: stderr_reader = threading.Thread(target=read, args=('stderr', process.stderr), daemon=True); stderr_reader.start()
+        read('stdout', process.stdout)
+        if capture_stderr: stderr_reader.join()
+        process.wait()
+    return subprocess.CompletedProcess(cmd, process.returncode, output['stdout'], output['stderr'])
 
 # --- ExifTool Functions ---
 def find_exiftool():
     """Tries to find the ExifTool executable."""
-    if os.name == 'nt': check_cmds = [['where', 'exiftool.exe'], ['where', 'exiftool']]
-    else: check_cmds = [['which', 'exiftool']]
-    for cmd in check_cmds:
-        try:
-            result = subprocess.run(cmd, capture_output=True, text=True, check=False, encoding='utf-8')
-            if result.returncode == 0 and result.stdout:
-                path = result.stdout.strip().split('\n')[0]
-                if os.path.exists(path):
-                     print(f"Found ExifTool at: {path}")
-                     return path
-        except FileNotFoundError: continue
-        except Exception as e: print(f"Error checking for ExifTool with '{' '.join(cmd)}': {e}")
-    print("Warning: ExifTool not found in standard locations or PATH.")
+    # shutil.which walks PATH (and PATHEXT on Windows) in-process instead of spawning which/where
+    for name in (['exiftool.exe', 'exiftool'] if _IS_WIN else ['exiftool']):
+        path = shutil.which(name)
+        if path:
+            logger.info('Found ExifTool at: %s', path)
+            return path
+    logger.warning('ExifTool not found in standard locations or PATH.')
     return None
 
 EXIFTOOL_PATH = find_exiftool()
 
+# Only the tags extract_caption, extract_gps_data, extract_orientation_data and the dimension code read.
+# ExifTool skips everything else and reports these from every group (and as Composite tags where applicable).
+_EXIFTOOL_TAGS = [
+    'ImageDescription', 'Description', 'Caption-Abstract', 'Title', 'ObjectName', 'Headline',    # Caption
+    'UserComment', 'XPTitle', 'XPComment', 'XPSubject', 'Comment',
+    'GPSLatitude', 'GPSLongitude', 'GPSLatitudeRef', 'GPSLongitudeRef', 'GPSPosition',            # GPS
+    'GPSImgDirection', 'GPSDestBearing', 'CameraAngle',                                           # Compass direction
+    'Orientation',                                                                                # Dimensions
+]
+_EXIFTOOL_TAG_ARGS = tuple('-' + tag for tag in _EXIFTOOL_TAGS)
+
+class ExifToolServer:
+    """Keeps one ExifTool process alive in -stay_open mode so photos don't each pay the Perl startup cost."""
+    _instance = None
+    _instance_lock = threading.Lock()
+
+    def __init__(self, exiftool_path):
+        self.exiftool_path = exiftool_path
+        self._process = None; self._helper = None
+        self._lock = threading.Lock()
+
+    @classmethod
+    def get(cls):
+        """Returns the shared server for this process, or None if ExifTool is unavailable."""
+        if not EXIFTOOL_PATH: return None
+        with cls._instance_lock:
+            if cls._instance is None:
+                cls._instance = cls(EXIFTOOL_PATH)
+                atexit.register(cls._instance.close)
+            return cls._instance
+
+    def _start_helper(self):
+        self._helper = ExifToolHelper(executable=self.exiftool_path, common_args=['-charset', 'filename=utf8', '-n', '-a', '-G1'],
+                                      encoding='utf-8', check_execute=False) # Match -charset filename=utf8 rather than the locale
+        self._helper.run()
+
+    def _start(self):
+        self._process = subprocess.Popen([self.exiftool_path, '-stay_open', 'True', '-@', '-'],
+                                         stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL)
+
+    def execute(self, *args):
+        """Sends one argument list to the daemon and returns everything printed before '{ready}'."""
+        with self._lock:
+            if self._process is None or self._process.poll() is not None: self._start()
+            try:
+                self._process.stdin.write(('\n'.join(args + ('-execute',)) + '\n').encode('utf-8'))
+                self._process.stdin.flush()
+                output = []
+                for line in iter(self._process.stdout.readline, b''):
+                    if line.rstrip(b'\r\n') == b'{ready}': break
+                    output.append(line)
+                else: raise RuntimeError("ExifTool exited unexpectedly")
+            except (OSError, RuntimeError):
+                self._process = None; raise
+        return b''.join(output).decode('utf-8', errors='replace')
+
+    def get_metadata(self, *photo_paths):
+        """Returns one metadata dict per photo ExifTool could read, limited to _EXIFTOOL_TAGS."""
+        if PYEXIFTOOL_SUPPORT:
+            with self._lock:
+                if self._helper is None or not self._helper.running: self._start_helper()
+                return self._helper.get_tags(list(photo_paths), _EXIFTOOL_TAGS)
+        output = self.execute('-charset', 'filename=utf8', '-j', '-n', '-a', '-G1', *_EXIFTOOL_TAG_ARGS, *photo_paths)
+        return _json.loads(output) if output.strip() else []
+
+    def close(self):
+        """Asks the daemon to exit; kills it if it doesn't within a few seconds."""
+        with self._lock:
+            process, self._process = self._process, None
+            helper, self._helper = self._helper, None
+        if helper is not None and helper.running: helper.terminate()
+        if process is None or process.poll() is not None: return
+        try:
+            process.stdin.write(b'-stay_open\nFalse\n'); process.stdin.flush(); process.stdin.close()
+            process.wait(timeout=5)
+        except (OSError, subprocess.TimeoutExpired): process.kill()
+
+def _clean_exiftool_record(record):
+    """Drops placeholder values ExifTool reports for empty tags."""
+    return {k: v for k, v in record.items() if not (isinstance(v, str) and v.lower() in ('null', '', 'none'))}
+
+# ExifTool results keyed by _cache_key(path), filled by prefetch_metadata_bulk and per-photo reads. Bounded LRU.
+_EXIFTOOL_CACHE = OrderedDict()
+_EXIFTOOL_CACHE_SIZE = 4096
+_EXIFTOOL_CACHE_LOCK = threading.Lock()
+
+def _norm_path(photo_path):
+    return os.path.normcase(os.path.abspath(photo_path))
+
+def _cache_key(photo_path):
+    """(path, size, mtime_ns) so an edited file is never served stale metadata."""
+    try: st = os.stat(photo_path)
+    except OSError: return (_norm_path(photo_path), None, None)
+    return (_norm_path(photo_path), st.st_size, st.st_mtime_ns)
+
+def _cache_put(photo_path, metadata):
+    key = _cache_key(photo_path)
+    with _EXIFTOOL_CACHE_LOCK:
+        _EXIFTOOL_CACHE[key] = metadata; _EXIFTOOL_CACHE.move_to_end(key)
+        while len(_EXIFTOOL_CACHE) > _EXIFTOOL_CACHE_SIZE: _EXIFTOOL_CACHE.popitem(last=False)
+
+def _cache_get(photo_path):
+    key = _cache_key(photo_path)
+    with _EXIFTOOL_CACHE_LOCK:
+        if key not in _EXIFTOOL_CACHE: return None
+        _EXIFTOOL_CACHE.move_to_end(key)
+        return _EXIFTOOL_CACHE[key]
+
+def prefetch_metadata_bulk(photo_paths):
+    """Reads ExifTool metadata for all photos in one command and caches it. Returns {path: metadata}."""
+    server = ExifToolServer.get()
+    if server is None or not photo_paths: return {}
+    try: metadata_list = server.get_metadata(*photo_paths)
+    except ValueError as json_err: logger.error('Error parsing bulk ExifTool JSON: %s', json_err); return {}
+    except Exception as e: logger.error('Error running bulk ExifTool read: %s', e); return {}
+    by_path = {_norm_path(record['SourceFile']): record for record in metadata_list if isinstance(record, dict) and 'SourceFile' in record}
+    results = {}
+    for photo_path in photo_paths:
+        # Files ExifTool couldn't read are cached as empty so the per-photo pass doesn't retry them
+        results[photo_path] = _clean_exiftool_record(by_path.get(_norm_path(photo_path), {}))
+        _cache_put(photo_path, results[photo_path])
+    logger.info('Prefetched ExifTool metadata for %s of %s photos.', len(by_path), len(photo_paths))
+    return results
+
 def get_metadata_with_exiftool(photo_path):
-    """Use ExifTool to extract metadata."""
+    """Use ExifTool to extract metadata. Returns None when ExifTool is unavailable or the lookup failed,
+    {} when ExifTool ran but found nothing."""
     global EXIFTOOL_PATH
-    if not EXIFTOOL_PATH: return {}
+    cached = _cache_get(photo_path)
+    if cached is not None: return cached
+    server = ExifToolServer.get()
+    if server is None: return None
     try:
-        cmd = [EXIFTOOL_PATH, '-j', '-n', '-a', '-G1', photo_path]
-        try: result = subprocess.run(cmd, capture_output=True, text=True, check=False, encoding='utf-8', errors='replace')
-        except UnicodeDecodeError:
-             print("ExifTool output decode error (UTF-8), trying default encoding...")
-             result = subprocess.run(cmd, capture_output=True, text=True, check=False)
-        if result.returncode != 0 and result.stderr and ("Warning:" not in result.stderr or "Error:" in result.stderr):
-            print(f"ExifTool potential error (RC: {result.returncode}): {result.stderr.strip()}")
-        if result.stdout:
-            try:
-                metadata_list = json.loads(result.stdout)
-                if metadata_list and isinstance(metadata_list, list) and len(metadata_list) > 0:
-                    cleaned_metadata = {k: v for k, v in metadata_list[0].items() if not (isinstance(v, str) and v.lower() in ('null', '', 'none'))}
-                    return cleaned_metadata
-                return {}
-            except json.JSONDecodeError as json_err:
-                print(f"Error parsing ExifTool JSON for {os.path.basename(photo_path)}: {json_err}")
-                return {}
-        else: return {}
+        metadata_list = server.get_metadata(photo_path)
+        if metadata_list and isinstance(metadata_list, list) and len(metadata_list) > 0:
+            metadata = _clean_exiftool_record(metadata_list[0])
+            _cache_put(photo_path, metadata)
+            return metadata
+        return {}
+    except ValueError as json_err: logger.error('Error parsing ExifTool JSON for %s: %s', os.path.basename(photo_path), json_err); return None
     except FileNotFoundError:
-         print(f"Error: ExifTool command ('{EXIFTOOL_PATH}') not found during execution."); EXIFTOOL_PATH = None; return {}
-    except Exception as e: print(f"Error running ExifTool for {os.path.basename(photo_path)}: {str(e)}"); return {}
+         logger.error("ExifTool command ('%s') not found during execution.", EXIFTOOL_PATH); EXIFTOOL_PATH = None; return None
+    except Exception as e: logger.error('Error running ExifTool for %s: %s', os.path.basename(photo_path), e); return None
 
 # --- Metadata Extraction Logic ---
 
@@ -81,32 +257,37 @@ def extract_caption(filename, tags=None, exiftool_metadata=None, mdls_metadata=N
     """
     Extracts caption/description, prioritizing user-entered description fields.
     """
-    print(f"  Extracting caption for: {filename}")
+    logger.debug('Extracting caption for: %s', filename)
     caption = None
 
     # --- Priority 1: ExifTool ---
     if exiftool_metadata:
-        print(f"    Checking ExifTool metadata...")
+        logger.debug('Checking ExifTool metadata...')
+        # Case-insensitive key lookup just in case ExifTool's JSON output differs slightly sometimes; built once per photo
+        keys_by_lower = {k.lower(): k for k in exiftool_metadata}
         # ***** FIX: Added 'IFD0:ImageDescription' to the primary list *****
         # These are most likely to hold the user-entered description
         primary_description_fields = [
             'IFD0:ImageDescription', # Added based on ExifTool output for your HEIC
             'EXIF:ImageDescription', # Keep checking standard EXIF group too
             'XMP:Description',       # Common XMP equivalent (used by many apps)
+            'XMP-dc:Description',    # -G1 name of the same tag
             'IPTC:Caption-Abstract', # IPTC standard caption
             'Apple:Description',     # Specific Apple tag if available via ExifTool
             'QuickTime:Description', # Sometimes used in HEIC containers
-            'QuickTime:Title'        # Sometimes Title is used for description
+            'Keys:Description', 'ItemList:Description', 'UserData:Description', # -G1 names of the QuickTime tag
+            'QuickTime:Title',       # Sometimes Title is used for description
+            'Keys:Title', 'ItemList:Title', 'UserData:Title'
         ]
         # Check these primary fields
         for field in primary_description_fields:
-            # Case-insensitive check just in case ExifTool's JSON output differs slightly sometimes
-            if field.lower() in map(str.lower, exiftool_metadata.keys()) and isinstance(exiftool_metadata[field], str):
-                 value = exiftool_metadata[field].strip()
-                 print(f"      Checking ExifTool Primary Field '{field}': Found value '{value[:60]}{'...' if len(value)>60 else ''}'")
+            found_key = keys_by_lower.get(field.lower())
+            if found_key and isinstance(exiftool_metadata[found_key], str):
+                 value = exiftool_metadata[found_key].strip()
+                 logger.debug("Checking ExifTool Primary Field '%s': Found value '%.60s'", field, value)
                  if value:
                      caption = value
-                     print(f"      >> SELECTED Caption from ExifTool '{field}'")
+                     logger.debug(">> SELECTED Caption from ExifTool '%s'", field)
                      return caption # Return *immediately* if a primary description is found
             # else: # Optional: Log if field exists but is not string or is empty
             #      if field in exiftool_metadata:
@@ -115,92 +296,95 @@ def extract_caption(filename, tags=None, exiftool_metadata=None, mdls_metadata=N
 
         # If no primary description found, check other related fields (Title, Comment etc.)
         if caption is None:
-            print(f"    Primary description fields not found or empty. Checking secondary fields...")
+            logger.debug('Primary description fields not found or empty. Checking secondary fields...')
             secondary_related_fields = [
                 'XMP:Title',             # Title might be used
+                'XMP-dc:Title',          # -G1 name of the same tag
                 'IPTC:ObjectName',       # IPTC standard title/name
                 'XMP:Headline',
+                'XMP-photoshop:Headline',
                 'EXIF:UserComment',      # Handle potential encoding prefix
+                'ExifIFD:UserComment',   # -G1 name of the same tag
                 'EXIF:XPTitle', 'EXIF:XPComment', 'EXIF:XPSubject',
+                'IFD0:XPTitle', 'IFD0:XPComment', 'IFD0:XPSubject',
                 'RIFF:UserComment',
-                'Comment'
+                'Comment',
+                'File:Comment'           # -G1 name of the JPEG comment
             ]
             for field in secondary_related_fields:
-                 # Case-insensitive check
-                 field_lower = field.lower()
-                 found_key = next((k for k in exiftool_metadata if k.lower() == field_lower), None)
+                 found_key = keys_by_lower.get(field.lower())
 
                  if found_key and isinstance(exiftool_metadata[found_key], str):
                     value = exiftool_metadata[found_key].strip()
-                    print(f"      Checking ExifTool Secondary Field '{found_key}': Found value '{value[:60]}{'...' if len(value)>60 else ''}'")
+                    logger.debug("Checking ExifTool Secondary Field '%s': Found value '%.60s'", found_key, value)
                     # Special handling for UserComment encoding prefixes
-                    if found_key.upper() == 'EXIF:USERCOMMENT' and '\x00' in value:
+                    if found_key.upper().endswith(':USERCOMMENT') and '\x00' in value:
                         parts = value.split('\x00')
                         potential_caption = parts[-1].strip()
                         value = potential_caption if potential_caption else (parts[-2].strip() if len(parts) > 1 else "")
-                        print(f"        (UserComment processed value: '{value[:60]}{'...' if len(value)>60 else ''}')")
+                        logger.debug("(UserComment processed value: '%.60s')", value)
 
                     if value:
                         caption = value
-                        print(f"      >> SELECTED Caption from ExifTool Secondary '{found_key}'")
+                        logger.debug(">> SELECTED Caption from ExifTool Secondary '%s'", found_key)
                         return caption # Return first non-empty secondary field found
 
     # --- Priority 2: macOS mdls ---
     if mdls_metadata and caption is None:
-        print(f"    ExifTool found no caption. Checking mdls metadata...")
+        logger.debug('ExifTool found no caption. Checking mdls metadata...')
         # Prioritize description field in mdls as well
-        mdls_fields_priority = ['kMDItemDescription', 'kMDItemTitle', 'kMDItemHeadline', 'kMDItemSubject', 'kMDItemComment']
-        for field in mdls_fields_priority:
-             if field in mdls_metadata and mdls_metadata[field] and mdls_metadata[field] != "(null)":
-                  value = mdls_metadata[field].strip()
-                  print(f"      Checking mdls Field '{field}': Found value '{value[:60]}{'...' if len(value)>60 else ''}'")
+        for field in _MDLS_CAPTION_ATTRS:
+             value = mdls_metadata.get(field)
+             if value and value != "(null)":
+                  value = value.strip()
+                  logger.debug("Checking mdls Field '%s': Found value '%.60s'", field, value)
                   if value:
                       caption = value
-                      print(f"      >> SELECTED Caption from mdls '{field}'")
+                      logger.debug(">> SELECTED Caption from mdls '%s'", field)
                       return caption
 
-    # --- Priority 3: exifread Tags ---
+    # --- Priority 3: Pillow EXIF Tags ---
     if tags and caption is None:
-        print(f"    ExifTool/mdls found no caption. Checking exifread tags...")
-        # Only check the most direct description tag from exifread's perspective
-        tag_name = 'Image ImageDescription'
-        if tag_name in tags:
-             try:
-                 value = str(tags[tag_name]).strip()
-                 print(f"      Checking exifread Field '{tag_name}': Found value '{value[:60]}{'...' if len(value)>60 else ''}'")
-                 if '\x00' in value: # Clean potential encoding markers/nulls
-                     value = value.split('\x00')[-1].strip()
-                 if value:
-                     caption = value
-                     print(f"      >> SELECTED Caption from exifread '{tag_name}'")
-                     return caption
-             except Exception as e:
-                 print(f"      Error processing exifread tag '{tag_name}': {e}")
+        logger.debug('ExifTool/mdls found no caption. Checking Pillow EXIF tags...')
+        # Description first, then the comment/title tags Windows and some cameras write
+        for tag_name in _EXIF_CAPTION_TAGS:
+            if tag_name not in tags: continue
+            try:
+                value = str(tags[tag_name]).strip()
+                logger.debug("Checking Pillow EXIF Field '%s': Found value '%.60s'", tag_name, value)
+                if '\x00' in value: # Clean potential encoding markers/nulls
+                    value = value.split('\x00')[-1].strip()
+                if value:
+                    caption = value
+                    logger.debug(">> SELECTED Caption from Pillow EXIF '%s'", tag_name)
+                    return caption
+            except Exception as e:
+                logger.error("Error processing EXIF tag '%s': %s", tag_name, e)
 
 
     # --- Priority 4: Check AAE Sidecar ---
     if aae_data and caption is None:
-        print("    ExifTool/mdls/exifread found no caption. Checking AAE sidecar...")
-        match_adj = re.search(r'<key>adjustmentDescription</key>\s*<string>([^<]+)</string>', aae_data)
-        if match_adj:
-            value = match_adj.group(1).strip()
-            print(f"      Checking AAE 'adjustmentDescription': Found value '{value[:60]}{'...' if len(value)>60 else ''}'")
+        logger.debug('ExifTool/mdls/EXIF found no caption. Checking AAE sidecar...')
+        value = _aae_adjustment_description(aae_data)
+        if value is not None:
+            value = value.strip()
+            logger.debug("Checking AAE 'adjustmentDescription': Found value '%.60s'", value)
             if value:
                 caption = value
-                print(f"      >> SELECTED Caption from AAE adjustmentDescription")
+                logger.debug('>> SELECTED Caption from AAE adjustmentDescription')
                 return caption
-        match_desc = re.search(r'<string name="description">([^<]+)</string>', aae_data)
+        match_desc = _AAE_DESC_RE.search(aae_data.decode('utf-8', errors='ignore'))
         if match_desc: # Less likely for main description, but check as fallback
             value = match_desc.group(1).strip()
-            print(f"      Checking AAE 'description': Found value '{value[:60]}{'...' if len(value)>60 else ''}'")
+            logger.debug("Checking AAE 'description': Found value '%.60s'", value)
             if value:
                  caption = value
-                 print(f"      >> SELECTED Caption from AAE description")
+                 logger.debug('>> SELECTED Caption from AAE description')
                  return caption
 
     # --- Fallback ---
     if caption is None:
-        print(f"    No specific caption metadata found for {filename}.")
+        logger.debug('No specific caption metadata found for %s.', filename)
 
     return caption # Return the found caption or None
 
@@ -208,14 +392,21 @@ def extract_caption(filename, tags=None, exiftool_metadata=None, mdls_metadata=N
 
 
 # --- [ convert_gps_to_decimal, extract_gps_data, extract_orientation_data, get_macos_metadata, get_aae_data, apply_exif_orientation remain the same ] ---
+def _rational_to_float(value):
+    """float() for EXIF rationals (Pillow IFDRational), dividing numerator by denominator directly
+    instead of going through Fraction normalisation."""
+    denominator = getattr(value, 'denominator', None)
+    if denominator is None: return float(value)
+    return value.numerator / denominator
+
 def convert_gps_to_decimal(gps_coords, gps_ref):
     """Converts GPS from deg/min/sec or string to decimal."""
     try:
         # Handle numeric list/tuple [deg, min, sec]
         if isinstance(gps_coords, (list, tuple)) and len(gps_coords) == 3:
-            degrees = float(gps_coords[0])
-            minutes = float(gps_coords[1])
-            seconds = float(gps_coords[2])
+            degrees = _rational_to_float(gps_coords[0])
+            minutes = _rational_to_float(gps_coords[1])
+            seconds = _rational_to_float(gps_coords[2])
             decimal = degrees + (minutes / 60.0) + (seconds / 3600.0)
         # Handle single numeric value (already decimal or just degrees)
         elif isinstance(gps_coords, (int, float)):
@@ -223,7 +414,7 @@ def convert_gps_to_decimal(gps_coords, gps_ref):
         # Handle string format (attempt parsing)
         elif isinstance(gps_coords, str):
              # Clean string - remove deg, ', " symbols and extra whitespace
-            cleaned = re.sub(r'[^\d\.\s-]', '', gps_coords).strip()
+            cleaned = _GPS_NON_NUMERIC_RE.sub('', gps_coords).strip()
             parts = cleaned.split()
             if len(parts) == 3: # Assume deg min sec
                 degrees = float(parts[0])
@@ -248,32 +439,44 @@ def convert_gps_to_decimal(gps_coords, gps_ref):
         if is_latitude and not (-90 <= decimal <= 90): return None
         if is_longitude and not (-180 <= decimal <= 180): return None
         return decimal
-    except Exception as e: print(f"Error converting GPS coordinates ('{gps_coords}', Ref: '{gps_ref}'): {str(e)}"); return None
+    except Exception as e: logger.error("Error converting GPS coordinates ('%s', Ref: '%s'): %s", gps_coords, gps_ref, e); return None
+
+def _gps_decimal_fast(value, ref):
+    """Signs an already-decimal coordinate from its hemisphere reference, skipping convert_gps_to_decimal's type dispatch."""
+    value = float(value)
+    return -value if value > 0 and ref in ('S', 'W') else value
 
 def extract_gps_data(tags=None, exiftool_metadata=None, mdls_metadata=None, file_path=None):
-    """Extracts GPS Lat/Lon, prioritizing ExifTool, then mdls, then exifread."""
+    """Extracts GPS Lat/Lon, prioritizing ExifTool, then mdls, then Pillow EXIF tags."""
     latitude, longitude = None, None
     if exiftool_metadata:
         gps_keys_sets = [
             {'lat': 'EXIF:GPSLatitude', 'lon': 'EXIF:GPSLongitude', 'lat_ref': 'EXIF:GPSLatitudeRef', 'lon_ref': 'EXIF:GPSLongitudeRef'},
             {'lat': 'Composite:GPSLatitude', 'lon': 'Composite:GPSLongitude'},
             {'lat': 'XMP:GPSLatitude', 'lon': 'XMP:GPSLongitude'},
-            {'lat': 'GPS:Latitude', 'lon': 'GPS:Longitude', 'lat_ref': 'GPS:LatitudeRef', 'lon_ref': 'GPS:LongitudeRef'}, ]
+            {'lat': 'GPS:Latitude', 'lon': 'GPS:Longitude', 'lat_ref': 'GPS:LatitudeRef', 'lon_ref': 'GPS:LongitudeRef'},
+            # Family-1 group names, which is what ExifTool reports with -G1
+            {'lat': 'GPS:GPSLatitude', 'lon': 'GPS:GPSLongitude', 'lat_ref': 'GPS:GPSLatitudeRef', 'lon_ref': 'GPS:GPSLongitudeRef'},
+            {'lat': 'XMP-exif:GPSLatitude', 'lon': 'XMP-exif:GPSLongitude'}, ]
         for keys in gps_keys_sets:
             lat_val = exiftool_metadata.get(keys['lat']); lon_val = exiftool_metadata.get(keys['lon'])
             if lat_val is not None and lon_val is not None:
                  lat_ref = exiftool_metadata.get(keys.get('lat_ref')); lon_ref = exiftool_metadata.get(keys.get('lon_ref'))
-                 latitude = convert_gps_to_decimal(lat_val, lat_ref); longitude = convert_gps_to_decimal(lon_val, lon_ref)
-                 if latitude is not None and longitude is not None: return latitude, longitude
+                 if isinstance(lat_val, (int, float)) and isinstance(lon_val, (int, float)):
+                     # ExifTool runs with -n, so these are normally decimal degrees already
+                     latitude = _gps_decimal_fast(lat_val, lat_ref); longitude = _gps_decimal_fast(lon_val, lon_ref)
+                 else: latitude = convert_gps_to_decimal(lat_val, lat_ref); longitude = convert_gps_to_decimal(lon_val, lon_ref)
+                 if latitude is not None and longitude is not None and -90 <= latitude <= 90 and -180 <= longitude <= 180: return latitude, longitude
                  else: latitude, longitude = None, None
         if 'Composite:GPSPosition' in exiftool_metadata:
              pos_str = exiftool_metadata['Composite:GPSPosition']
-             if isinstance(pos_str, str) and ',' in pos_str:
+             # "lat, lon" when formatted, "lat lon" with -n
+             if isinstance(pos_str, str) and len(pos_str.replace(',', ' ').split()) == 2:
                   try:
-                       lat_str, lon_str = pos_str.split(',')
+                       lat_str, lon_str = pos_str.replace(',', ' ').split()
                        lat_cand = convert_gps_to_decimal(lat_str.strip(), None); lon_cand = convert_gps_to_decimal(lon_str.strip(), None)
                        if lat_cand is not None and lon_cand is not None: return lat_cand, lon_cand
-                  except Exception as e: print(f"    Error parsing Composite:GPSPosition: {e}")
+                  except Exception as e: logger.error('Error parsing Composite:GPSPosition: %s', e)
     if mdls_metadata:
          lat_val = mdls_metadata.get('kMDItemLatitude'); lon_val = mdls_metadata.get('kMDItemLongitude')
          if lat_val is not None and lon_val is not None and lat_val != "(null)" and lon_val != "(null)":
@@ -281,18 +484,18 @@ def extract_gps_data(tags=None, exiftool_metadata=None, mdls_metadata=None, file
                   latitude = float(lat_val); longitude = float(lon_val)
                   if -90 <= latitude <= 90 and -180 <= longitude <= 180: return latitude, longitude
                   else: latitude, longitude = None, None
-             except (ValueError, TypeError) as e: print(f"    Error converting mdls GPS values: {e} (Lat='{lat_val}', Lon='{lon_val}')")
+             except (ValueError, TypeError) as e: logger.error("Error converting mdls GPS values: %s (Lat='%s', Lon='%s')", e, lat_val, lon_val)
     if tags:
         try:
             if 'GPS GPSLatitude' in tags and 'GPS GPSLongitude' in tags:
-                lat_val = tags['GPS GPSLatitude'].values; lon_val = tags['GPS GPSLongitude'].values
+                lat_val = tags['GPS GPSLatitude']; lon_val = tags['GPS GPSLongitude']
                 lat_ref_tag = tags.get('GPS GPSLatitudeRef'); lon_ref_tag = tags.get('GPS GPSLongitudeRef')
-                lat_ref = str(lat_ref_tag.values).strip() if lat_ref_tag else 'N'
-                lon_ref = str(lon_ref_tag.values).strip() if lon_ref_tag else 'E'
+                lat_ref = str(lat_ref_tag).strip() if lat_ref_tag else 'N'
+                lon_ref = str(lon_ref_tag).strip() if lon_ref_tag else 'E'
                 latitude = convert_gps_to_decimal(lat_val, lat_ref); longitude = convert_gps_to_decimal(lon_val, lon_ref)
                 if latitude is not None and longitude is not None: return latitude, longitude
                 else: latitude, longitude = None, None
-        except Exception as e: print(f"    Error extracting GPS from exifread tags: {str(e)}")
+        except Exception as e: logger.error('Error extracting GPS from EXIF tags: %s', e)
     return None, None
 
 def extract_orientation_data(tags=None, exiftool_metadata=None, mdls_metadata=None):
@@ -301,60 +504,192 @@ def extract_orientation_data(tags=None, exiftool_metadata=None, mdls_metadata=No
     if exiftool_metadata:
         orientation_fields = [ 'Composite:GPSImgDirection', 'EXIF:GPSImgDirection', 'XMP:GPSImgDirection', 'GPS:ImgDirection',
             'Composite:GPSDestBearing', 'EXIF:GPSDestBearing', 'XMP:GPSDestBearing', 'GPS:GPSDestBearing',
+            'GPS:GPSImgDirection', 'XMP-exif:GPSImgDirection', 'XMP-exif:GPSDestBearing',
             'QuickTime:CameraAngle', 'Track1:CameraAngle', 'Track2:CameraAngle', ]
         for field in orientation_fields:
             if field in exiftool_metadata and exiftool_metadata[field] is not None:
                 try:
                     value_str = str(exiftool_metadata[field])
-                    numeric_part = re.match(r"^[+-]?(\d+(\.\d*)?|\.\d+)", value_str)
+                    numeric_part = _LEADING_NUMBER_RE.match(value_str)
                     if numeric_part:
                         orientation = float(numeric_part.group(0))
                         if 0 <= orientation <= 360: return orientation
                         else: orientation = None
-                except (ValueError, TypeError) as e: print(f"    Error parsing orientation from ExifTool '{field}': {e}"); continue
+                except (ValueError, TypeError) as e: logger.error("Error parsing orientation from ExifTool '%s': %s", field, e); continue
     if tags:
         orientation_tags = [ 'GPS GPSImgDirection', 'GPS GPSDestBearing' ]
         for tag_name in orientation_tags:
             if tag_name in tags:
                 try:
-                    value = tags[tag_name].values
-                    if isinstance(value, list): value = value[0]
-                    orientation = float(value) if isinstance(value, Fraction) else float(value)
+                    value = tags[tag_name]
+                    if isinstance(value, (list, tuple)): value = value[0]
+                    orientation = _rational_to_float(value)
                     if 0 <= orientation <= 360: return orientation
                     else: orientation = None
-                except (ValueError, TypeError, IndexError, AttributeError) as e: print(f"    Error parsing orientation from exifread tag '{tag_name}': {e}"); continue
+                except (ValueError, TypeError, IndexError, AttributeError, ZeroDivisionError) as e: logger.error("Error parsing orientation from EXIF tag '%s': %s", tag_name, e); continue
     return None
 
+# Spotlight caption attributes in extract_caption's priority order (Photos stores captions in kMDItemDescription)
+_MDLS_CAPTION_ATTRS = ['kMDItemDescription', 'kMDItemTitle', 'kMDItemHeadline', 'kMDItemSubject', 'kMDItemComment']
+# Spotlight attributes used for captions and GPS
+_MDLS_ATTRS = _MDLS_CAPTION_ATTRS + ['kMDItemLatitude', 'kMDItemLongitude']
+# mdls results filled by bulk_mdls, keyed by _cache_key(path)
+_MDLS_CACHE = {}
+_MDLS_CACHE_LOCK = threading.Lock()
+
+def _mdls_entries(output):
+    """Yields (attribute, value) for each 'name = value' line of mdls output, with value None for nulls."""
+    for key, quoted, bare in _MDLS_LINE_RE.findall(output):
+        yield key, None if bare == '(null)' else quoted or bare
+
+def bulk_mdls(photo_paths, attrs=_MDLS_ATTRS, batch_size=100):
+    """Reads Spotlight attributes for many photos with one mdls call per batch and caches them. Returns {path: data}."""
+    if not _HAS_MDLS: return {}
+    photo_paths = [path for path in photo_paths if os.path.isfile(path)]
+    results = {}
+    for start in range(0, len(photo_paths), batch_size):
+        batch = photo_paths[start:start + batch_size]
+        cmd = ['mdls', '-nullMarker', '(null)'] + [arg for attr in attrs for arg in ('-name', attr)] + batch
+        try: result = _run_bounded(cmd, capture_stderr=False)
+        except Exception as e: logger.error('Error running bulk mdls: %s', e); return results
+        # mdls prints every requested attribute for each file in turn, with no separator between files
+        entries = list(_mdls_entries(result.stdout))
+        if result.returncode != 0 or len(entries) != len(batch) * len(attrs):
+            logger.warning('Bulk mdls output not usable (Return Code: %s); falling back to per-photo mdls.', result.returncode)
+            return results
+        for i, photo_path in enumerate(batch):
+            mdls_data = {}
+            for key, value in entries[i * len(attrs):(i + 1) * len(attrs)]:
+                if value is not None: mdls_data[key] = value
+            results[photo_path] = mdls_data or None
+            with _MDLS_CACHE_LOCK: _MDLS_CACHE[_cache_key(photo_path)] = results[photo_path]
+    return results
+
 def get_macos_metadata(photo_path):
     """Uses macOS 'mdls' command to get metadata."""
-    if not shutil.which('mdls'): return None
+    key = _cache_key(photo_path)
+    with _MDLS_CACHE_LOCK:
+        if key in _MDLS_CACHE: return _MDLS_CACHE[key]
+    return _get_macos_metadata_cached(*key)
+
+@functools.lru_cache(maxsize=4096)
+def _get_macos_metadata_cached(photo_path, size, mtime_ns):
+    """Memoized on (path, size, mtime_ns); size/mtime_ns only serve to invalidate the entry."""
+    if not _HAS_MDLS: return None
     try:
-        cmd = ['mdls', '-nullMarker', '(null)', photo_path]
-        result = subprocess.run(cmd, capture_output=True, check=False, text=True, encoding='utf-8')
+        # Ask only for the attributes we use, in one call, rather than dumping every Spotlight attribute
+        cmd = ['mdls', '-nullMarker', '(null)'] + [arg for attr in _MDLS_ATTRS for arg in ('-name', attr)] + [photo_path]
+        result = _run_bounded(cmd)
         if result.returncode == 0 and result.stdout:
-             mdls_data = {}
-             keywords = ['kMDItemDescription', 'kMDItemTitle', 'kMDItemHeadline', 'kMDItemSubject',
-                         'kMDItemComment', 'kMDItemLatitude', 'kMDItemLongitude']
-             for line in result.stdout.splitlines():
-                 parts = line.split(' = ', 1)
-                 if len(parts) == 2:
-                     key = parts[0].strip()
-                     if key in keywords:
-                         value = parts[1].strip().strip('"')
-                         if value != '(null)': mdls_data[key] = value
+             mdls_data = {key: value for key, value in _mdls_entries(result.stdout) if value is not None}
              return mdls_data if mdls_data else None
-        else: print(f"Error running mdls (Return Code: {result.returncode}): {result.stderr}"); return None
-    except Exception as e: print(f"Error getting macOS metadata via mdls: {str(e)}"); return None
+        else: logger.error('Error running mdls (Return Code: %s): %s', result.returncode, result.stderr); return None
+    except Exception as e: logger.error('Error getting macOS metadata via mdls: %s', e); return None
 
-def get_aae_data(photo_path):
-    """Reads content of .AAE sidecar file if it exists."""
-    aae_path = os.path.splitext(photo_path)[0] + '.AAE'
-    if os.path.exists(aae_path):
+def _aae_adjustment_description(aae_data):
+    """Returns the adjustmentDescription string of an AAE plist (XML or binary, as bytes), or None."""
+    try:
+        plist = plistlib.loads(aae_data)
+    except (plistlib.InvalidFileException, ExpatError, ValueError):
+        # Not a well-formed plist; fall back to scanning the raw text
+        match = _AAE_ADJUSTMENT_DESC_RE.search(aae_data.decode('utf-8', errors='ignore'))
+        return match.group(1) if match else None
+    value = plist.get('adjustmentDescription') if isinstance(plist, dict) else None
+    return value if isinstance(value, str) else None
+
+# Sidecars are small plists; the cap only guards against reading a huge or bogus file whole
+_MAX_AAE_BYTES = 1 << 20
+
+@functools.lru_cache(maxsize=256)
+def _list_dir_names(dirpath):
+    """Maps lowercased entry names of a directory to their actual names (one scandir per directory)."""
+    try:
+        with os.scandir(dirpath or '.') as entries: return {entry.name.lower(): entry.name for entry in entries}
+    except OSError: return {}
+
+def _aae_path(photo_path, filename_no_ext=None):
+    """Returns the path of the photo's .AAE sidecar, or None. Pass filename_no_ext if the caller already split it off."""
+    dirpath, filename = os.path.split(photo_path)
+    if filename_no_ext is None: filename_no_ext = os.path.splitext(filename)[0]
+    aae_name = _list_dir_names(dirpath).get(filename_no_ext.lower() + '.aae')
+    return os.path.join(dirpath, aae_name) if aae_name else None
+
+def get_aae_data(photo_path, filename_no_ext=None):
+    """Reads the raw bytes of the .AAE sidecar file if it exists. Pass filename_no_ext if the caller already split it off."""
+    aae_path = _aae_path(photo_path, filename_no_ext)
+    if aae_path:
         try:
-            with open(aae_path, 'r', encoding='utf-8', errors='ignore') as f: return f.read()
-        except Exception as e: print(f"Error reading AAE file '{aae_path}': {str(e)}")
+            with open(aae_path, 'rb') as f: return f.read(_MAX_AAE_BYTES)
+        except Exception as e: logger.error("Error reading AAE file '%s': %s", aae_path, e)
+    return None
+
+# Pillow EXIF tag IDs, mapped to the names extract_caption/extract_gps_data/extract_orientation_data look up
+_EXIF_IFD0_TAGS = {270: 'Image ImageDescription', 274: 'Image Orientation',
+                   0x9C9B: 'Image XPTitle', 0x9C9C: 'Image XPComment', 0x9C9F: 'Image XPSubject'}
+_EXIF_SUB_IFD_TAGS = {0x9286: 'EXIF UserComment'}
+_EXIF_GPS_TAGS = {1: 'GPS GPSLatitudeRef', 2: 'GPS GPSLatitude', 3: 'GPS GPSLongitudeRef', 4: 'GPS GPSLongitude',
+                  17: 'GPS GPSImgDirection', 24: 'GPS GPSDestBearing'}
+_EXIF_SUB_IFD = 0x8769
+_GPS_IFD = 0x8825
+# Checked in order by extract_caption
+_EXIF_CAPTION_TAGS = ['Image ImageDescription', 'EXIF UserComment', 'Image XPComment', 'Image XPTitle', 'Image XPSubject']
+
+def _decode_exif_text(tag_id, value):
+    """Decodes the byte-valued text tags: UserComment has an 8-byte charset prefix, XP* tags are UTF-16LE."""
+    if not isinstance(value, bytes): return value
+    if tag_id == 0x9286:
+        charset, value = value[:8], value[8:]
+        return value.decode('utf-16' if charset.startswith(b'UNICODE') else 'utf-8', errors='replace').strip('\x00 ')
+    return value.decode('utf-16-le', errors='replace').strip('\x00')
+
+def _read_exif_tags(image):
+    """Reads the EXIF tags this module uses from an open Pillow image, without decoding pixels."""
+    exif = image.getexif()
+    tags = {}
+    for ifd, tag_names in ((exif, _EXIF_IFD0_TAGS), (exif.get_ifd(_EXIF_SUB_IFD), _EXIF_SUB_IFD_TAGS), (exif.get_ifd(_GPS_IFD), _EXIF_GPS_TAGS)):
+        tags.update((name, _decode_exif_text(tag_id, ifd[tag_id])) for tag_id, name in tag_names.items() if tag_id in ifd)
+    return tags or None
+
+# JPEG start-of-frame markers (baseline, progressive, lossless, arithmetic); all carry the frame size
+_JPEG_SOF_MARKERS = {0xC0, 0xC1, 0xC2, 0xC3, 0xC5, 0xC6, 0xC7, 0xC9, 0xCA, 0xCB, 0xCD, 0xCE, 0xCF}
+
+def _needs_pillow_exif(exiftool_metadata):
+    """True when Pillow has to read the EXIF tags itself. ExifTool's output, when present, already
+    holds every EXIF tag the extractors use (see _EXIFTOOL_TAGS)."""
+    return not exiftool_metadata
+
+def _fast_dimensions(path):
+    """Reads (width, height) from the file header without decoding pixels. Returns None for unhandled formats."""
+    try:
+        with open(path, 'rb') as f:
+            head = f.read(24)
+            if head[:8] == b'\x89PNG\r\n\x1a\n' and head[12:16] == b'IHDR':
+                return struct.unpack('>II', head[16:24])
+            if head[:2] == b'\xff\xd8':
+                # Walk the marker segments, seeking past each one, until the SOF segment
+                f.seek(2)
+                while True:
+                    marker = f.read(2)
+                    if len(marker) < 2 or marker[0] != 0xFF: return None
+                    code = marker[1]
+                    if code == 0xFF: f.seek(-1, 1); continue # Fill byte
+                    if code == 0x01 or 0xD0 <= code <= 0xD8: continue # Markers without a length
+                    if code in (0xD9, 0xDA): return None # End of image / start of scan before any SOF
+                    length, = struct.unpack('>H', f.read(2))
+                    if code in _JPEG_SOF_MARKERS:
+                        height, width = struct.unpack('>xHH', f.read(5))
+                        return width, height
+                    f.seek(length - 2, 1)
+        if HEIC_SUPPORT and path.lower().endswith(_HEIC_SUFFIXES):
+            # open_heif reads the container headers only; pixels are decoded on first access
+            return pillow_heif.open_heif(path, convert_hdr_to_8bit=False).size
+    except Exception as e: logger.debug("Could not read dimensions from header of '%s': %s", os.path.basename(path), e)
     return None
 
+def _oriented_size(size, orientation):
+    """Swaps width/height for EXIF orientations 5-8 (rotated 90/270 degrees)."""
+    return (size[1], size[0]) if orientation in (5, 6, 7, 8) else size
+
 def apply_exif_orientation(image):
     """Applies the rotation specified in EXIF Orientation tag to the image object."""
     try:
@@ -369,88 +704,273 @@ def apply_exif_orientation(image):
         if orientation in rotation_map:
             return image.transpose(rotation_map[orientation])
         else: return image
-    except (AttributeError, KeyError, IndexError, TypeError, SyntaxError) as e: print(f"Could not get or apply EXIF orientation: {e}"); return image
+    except (AttributeError, KeyError, IndexError, TypeError, SyntaxError) as e: logger.warning('Could not get or apply EXIF orientation: %s', e); return image
+
+
+def _convert_heic_to_temp_jpeg(photo_path):
+    """Converts a HEIC file to a temporary JPG and returns its path."""
+    with Image.open(photo_path) as img:
+        temp_fd, temp_path = tempfile.mkstemp(suffix='.jpg'); os.close(temp_fd)
+        img.convert('RGB').save(temp_path, 'JPEG', quality=90)
+        logger.debug('Successfully converted HEIC to temporary JPG: %s', os.path.basename(temp_path))
+        return temp_path
+
+def _cache_context(photo_path):
+    """Everything besides the photo file itself that a cached result depends on: which optional
+    readers were available and the state of the AAE sidecar (a caption source)."""
+    aae_path = _aae_path(photo_path)
+    try: aae_state = os.stat(aae_path).st_mtime_ns if aae_path else None
+    except OSError: aae_state = None
+    return f'heic={int(HEIC_SUPPORT)};mdls={int(_HAS_MDLS)};aae={aae_state}'
+
+class _MetadataCache:
+    """Persistent SQLite cache of extracted photo_data, keyed by (path, mtime_ns, size) plus _cache_context().
+    One connection per process."""
+    # Bump whenever extraction results or the photo_data layout change, so stale entries are dropped
+    VERSION = 4
+
+    def __init__(self, db_path):
+        self.db_path = db_path
+        self._conn = None; self._pid = None; self._disabled = False
+        self._lock = threading.Lock()
+
+    def _connection(self):
+        # Connections must not cross a fork, so worker processes open their own
+        if self._disabled: return None
+        if self._conn is None or self._pid != os.getpid():
+            try:
+                os.makedirs(os.path.dirname(self.db_path), exist_ok=True)
+                conn = sqlite3.connect(self.db_path, timeout=10, check_same_thread=False)
+                conn.execute('PRAGMA journal_mode=WAL')
+                if conn.execute('PRAGMA user_version').fetchone()[0] != self.VERSION:
+                    conn.execute('DROP TABLE IF EXISTS cache')
+                    conn.execute(f'PRAGMA user_version = {self.VERSION}')
+                conn.execute('CREATE TABLE IF NOT EXISTS cache (path TEXT PRIMARY KEY, mtime_ns INT, size INT, context TEXT, blob BLOB)')
+                conn.commit()
+                self._conn = conn; self._pid = os.getpid()
+            except (sqlite3.Error, OSError) as e:
+                logger.warning("Metadata cache unavailable ('%s'): %s", self.db_path, e); self._disabled = True; return None
+        return self._conn
+
+    @staticmethod
+    def _key(photo_path):
+        """Returns the (path, mtime_ns, size, context) key for a file, or None if it can't be stat'ed.
+        Computed before taking the lock, so threads don't queue behind each other's file system calls."""
+        try: st = os.stat(photo_path)
+        except OSError: return None
+        return _norm_path(photo_path), st.st_mtime_ns, st.st_size, _cache_context(photo_path)
+
+    def _lookup(self, photo_path, column):
+        """Returns the row holding column for an unchanged file, or None."""
+        key = self._key(photo_path)
+        if key is None: return None
+        with self._lock:
+            conn = self._connection()
+            if conn is None: return None
+            try: return conn.execute(f'SELECT {column} FROM cache WHERE path=? AND mtime_ns=? AND size=? AND context=?', key).fetchone()
+            except sqlite3.Error as e: logger.warning('Could not read metadata cache for %s: %s', os.path.basename(photo_path), e); return None
+
+    def get(self, photo_path):
+        """Returns the cached photo_data for an unchanged file, or None."""
+        row = self._lookup(photo_path, 'blob')
+        return self._unpickle(photo_path, row[0]) if row else None
+
+    def get_many(self, photo_paths):
+        """Returns {path: photo_data} for the unchanged files among photo_paths, with one lock acquisition."""
+        keys = {photo_path: self._key(photo_path) for photo_path in photo_paths}
+        blobs = {}
+        with self._lock:
+            conn = self._connection()
+            if conn is None: return {}
+            try:
+                for photo_path, key in keys.items():
+                    if key is None: continue
+                    row = conn.execute('SELECT blob FROM cache WHERE path=? AND mtime_ns=? AND size=? AND context=?', key).fetchone()
+                    if row: blobs[photo_path] = row[0]
+            except sqlite3.Error as e: logger.warning('Could not read metadata cache: %s', e)
+        results = {photo_path: self._unpickle(photo_path, blob) for photo_path, blob in blobs.items()}
+        return {photo_path: photo_data for photo_path, photo_data in results.items() if photo_data is not None}
+
+    @staticmethod
+    def _unpickle(photo_path, blob):
+        try: return pickle.loads(blob)
+        except Exception as e: logger.warning('Could not read metadata cache for %s: %s', os.path.basename(photo_path), e); return None
+
+    def put(self, photo_path, photo_data):
+        key = self._key(photo_path)
+        if key is None: return
+        blob = pickle.dumps(photo_data)
+        with self._lock:
+            conn = self._connection()
+            if conn is None: return
+            try:
+                conn.execute('INSERT OR REPLACE INTO cache (path, mtime_ns, size, context, blob) VALUES (?, ?, ?, ?, ?)', key + (blob,))
+                conn.commit()
+            except sqlite3.Error as e: logger.warning('Could not write metadata cache for %s: %s', os.path.basename(photo_path), e)
 
+_METADATA_CACHE = _MetadataCache(os.path.join(os.path.expanduser('~'), '.cache', 'photo_appendix_generator', 'metadata.sqlite'))
 
-def extract_metadata_from_photo(photo_path):
-    """Extract metadata from a single photo using multiple methods."""
-    print(f"\n--- Processing: {os.path.basename(photo_path)} ---")
+# Prefix of photo_data['error'] when a HEIC photo could not be converted
+_HEIC_ERROR = 'HEIC processing failed'
+
+def _convert_heic_into(photo_data):
+    """Stores a temporary JPG conversion of a HEIC photo in photo_data['temp_file']."""
+    try: photo_data['temp_file'] = _convert_heic_to_temp_jpeg(photo_data['path'])
+    except Exception as e:
+        logger.error("Failed to open or convert HEIC file '%s': %s", photo_data['filename'], e)
+        photo_data['error'] = f"{_HEIC_ERROR}: {e}"
+
+def _restore_cached_photo_data(photo_path, cached):
+    """Turns a persistent cache entry back into a fresh photo_data dict for photo_path."""
+    return dict(cached, path=photo_path, filename=os.path.basename(photo_path), temp_file=None)
+
+def _caption_from_filename(filename_no_ext):
+    """Fallback caption from the file name (without extension): the capture time encoded in
+    camera-style names, else the cleaned-up name."""
+    clean_name = _FILENAME_SEPARATOR_RE.sub(' ', _FILENAME_PREFIX_RE.sub('', filename_no_ext)).strip()
+    datetime_match = _FILENAME_DATETIME_RE.search(clean_name)
+    if datetime_match:
+        try: return f"Photo from {datetime.strptime(''.join(datetime_match.groups()), '%Y%m%d%H%M%S'):%Y-%m-%d %H:%M}"
+        except ValueError: pass # Not a real date/time; use the cleaned name
+    return clean_name or filename_no_ext
+
+def extract_metadata_from_photo(photo_path, exiftool_metadata=None):
+    """Extract metadata from a single photo using multiple methods.
+    HEIC files are not converted here; ensure_image_file() converts them when the pixels are actually needed.
+    exiftool_metadata, when given (e.g. from prefetch_metadata_bulk), is used instead of querying ExifTool."""
+    cached = _METADATA_CACHE.get(photo_path)
+    if cached is not None:
+        logger.debug("Using cached metadata: caption='%s', GPS=(%s, %s)", cached.get('caption'), cached.get('latitude'), cached.get('longitude'))
+        return _restore_cached_photo_data(photo_path, cached)
+    return _extract_uncached(photo_path, exiftool_metadata)
+
+def _extract_uncached(photo_path, exiftool_metadata=None):
+    """extract_metadata_from_photo without the cache lookup; stores its result in the cache."""
+    logger.debug('--- Processing: %s ---', os.path.basename(photo_path))
     photo_data = { 'path': photo_path, 'filename': os.path.basename(photo_path), 'caption': None, 'latitude': None, 'longitude': None,
         'orientation': None, 'temp_file': None, 'width': None, 'height': None, 'error': None }
-    original_path = photo_path; processing_path = photo_path; is_heic = photo_path.lower().endswith('.heic'); temp_conversion_file = None
+    filename_no_ext = os.path.splitext(photo_data['filename'])[0] # Shared by the AAE lookup and the fallback caption
+    exiftool_failed = False
+    is_heic = photo_path.lower().endswith(_HEIC_SUFFIXES)
     try:
-        if is_heic:
-            if HEIC_SUPPORT:
-                print("  HEIC file detected. Attempting conversion to temporary JPG...")
+        if exiftool_metadata is None: exiftool_metadata = get_metadata_with_exiftool(photo_path)
+        # Results extracted without ExifTool are incomplete, so they are not cached (see below)
+        exiftool_failed = exiftool_metadata is None
+        if exiftool_failed: exiftool_metadata = {}
+        exif_tags = None
+        if os.path.exists(photo_path):
+            read_exif = _needs_pillow_exif(exiftool_metadata)
+            # Without EXIF to read, a header walk is enough for the dimensions
+            size = None if read_exif else _fast_dimensions(photo_path)
+            if read_exif or size is None:
+                # A single Image.open (headers only, no pixel decode) serves both the EXIF tags and the dimensions
                 try:
                     with Image.open(photo_path) as img:
-                         photo_data['width'], photo_data['height'] = img.size
-                         temp_fd, temp_path = tempfile.mkstemp(suffix='.jpg'); os.close(temp_fd)
-                         img.convert('RGB').save(temp_path, 'JPEG', quality=90)
-                         photo_data['temp_file'] = temp_path; temp_conversion_file = temp_path; processing_path = temp_path
-                         print(f"  Successfully converted HEIC to temporary JPG: {os.path.basename(temp_path)}")
+                        if read_exif:
+                            try: exif_tags = _read_exif_tags(img)
+                            except Exception as e: logger.warning("Could not read EXIF tags from '%s': %s", photo_data['filename'], e)
+                        size = img.size
                 except Exception as e:
-                    print(f"  ERROR: Failed to open or convert HEIC file '{os.path.basename(photo_path)}': {str(e)}")
-                    photo_data['error'] = f"HEIC processing failed: {e}"; processing_path = original_path
-            else: print("  HEIC file detected, but pillow-heif not installed."); processing_path = original_path
-        if photo_data['width'] is None and os.path.exists(processing_path):
-            try:
-                with Image.open(processing_path) as img:
-                    img_oriented = apply_exif_orientation(img)
-                    photo_data['width'], photo_data['height'] = img_oriented.size
-                    print(f"  Image Dimensions (oriented): {photo_data['width']}x{photo_data['height']}")
-            except Exception as e:
-                print(f"  ERROR: Could not open image '{os.path.basename(processing_path)}': {str(e)}")
-                if not photo_data['error']: photo_data['error'] = f"Image open failed: {e}"
-        exiftool_metadata = get_metadata_with_exiftool(original_path)
-        mdls_metadata = get_macos_metadata(original_path) if os.name == 'posix' else None
-        aae_data = get_aae_data(original_path)
-        exifread_tags = None
-        if os.path.exists(processing_path):
-            try:
-                with open(processing_path, 'rb') as f: exifread_tags = exifread.process_file(f, stop_tag='JPEGThumbnail', details=False)
-            except Exception as e: print(f"  Warning: Could not read tags using exifread from '{os.path.basename(processing_path)}': {str(e)}")
-
-        # ***** FIX: Pass filename to extract_caption *****
-        photo_data['caption'] = extract_caption(photo_data['filename'], exifread_tags, exiftool_metadata, mdls_metadata, aae_data)
-
-        photo_data['latitude'], photo_data['longitude'] = extract_gps_data(exifread_tags, exiftool_metadata, mdls_metadata, original_path)
-        photo_data['orientation'] = extract_orientation_data(exifread_tags, exiftool_metadata, mdls_metadata)
+                    logger.error("Could not open image '%s': %s", photo_data['filename'], e)
+                    if read_exif: size = _fast_dimensions(photo_path)
+                    if size is None: photo_data['error'] = f"Image open failed: {e}"
+            if size is not None:
+                # HEIC sizes already have the container's rotation applied
+                orientation = None if is_heic else (exif_tags or {}).get('Image Orientation', exiftool_metadata.get('IFD0:Orientation'))
+                photo_data['width'], photo_data['height'] = _oriented_size(size, orientation)
+                logger.debug('Image Dimensions (oriented): %sx%s', photo_data['width'], photo_data['height'])
+        # ExifTool has the highest priority for captions and GPS, so Spotlight and the AAE sidecar
+        # are only consulted for whatever it did not provide
+        photo_data['caption'] = extract_caption(photo_data['filename'], exiftool_metadata=exiftool_metadata)
+        photo_data['latitude'], photo_data['longitude'] = extract_gps_data(exiftool_metadata=exiftool_metadata, file_path=photo_path)
+        if photo_data['caption'] is None or photo_data['latitude'] is None:
+            mdls_metadata = get_macos_metadata(photo_path) if _HAS_MDLS else None
+            if photo_data['caption'] is None:
+                photo_data['caption'] = extract_caption(photo_data['filename'], exif_tags, None, mdls_metadata, get_aae_data(photo_path, filename_no_ext))
+            if photo_data['latitude'] is None:
+                photo_data['latitude'], photo_data['longitude'] = extract_gps_data(exif_tags, None, mdls_metadata, photo_path)
+        photo_data['orientation'] = extract_orientation_data(exif_tags, exiftool_metadata)
         if photo_data['caption'] is None:
-            print("  No specific caption found. Generating fallback caption.")
-            filename_no_ext = os.path.splitext(photo_data['filename'])[0]
-            clean_name = re.sub(r'^(IMG|DSC|VID|PXL|Screenshot|Screen Shot)[\s_-]*', '', filename_no_ext, flags=re.IGNORECASE)
-            clean_name = re.sub(r'[_ -]+', ' ', clean_name).strip()
-            datetime_match = re.search(r'(\d{4})(\d{2})(\d{2})[\s_-]*(\d{2})(\d{2})(\d{2})', clean_name)
-            if datetime_match:
-                 try:
-                     dt_groups = datetime_match.groups()
-                     dt_obj = datetime(int(dt_groups[0]), int(dt_groups[1]), int(dt_groups[2]), int(dt_groups[3]), int(dt_groups[4]), int(dt_groups[5]))
-                     photo_data['caption'] = f"Photo from {dt_obj.strftime('%Y-%m-%d %H:%M')}"
-                 except ValueError: photo_data['caption'] = clean_name if clean_name else filename_no_ext
-            else: photo_data['caption'] = clean_name if clean_name else filename_no_ext
-            print(f"  Using fallback caption: '{photo_data['caption']}'")
+            logger.debug('No specific caption found. Generating fallback caption.')
+            photo_data['caption'] = _caption_from_filename(filename_no_ext)
+            logger.debug("Using fallback caption: '%s'", photo_data['caption'])
     except Exception as e:
-        print(f"  FATAL ERROR processing photo '{os.path.basename(photo_path)}': {str(e)}")
-        photo_data['error'] = f"Fatal processing error: {e}"; import traceback; traceback.print_exc()
-    if temp_conversion_file: photo_data['temp_file'] = temp_conversion_file
-    print(f"--- Finished Processing: {photo_data['filename']} ---")
-    print(f"  Caption:     '{photo_data.get('caption', 'N/A')}'")
-    print(f"  GPS:         Lat={photo_data.get('latitude', 'N/A')}, Lon={photo_data.get('longitude', 'N/A')}")
-    print(f"  Orientation: {photo_data.get('orientation', 'N/A')}")
-    print(f"  Dimensions:  {photo_data.get('width', 'N/A')}x{photo_data.get('height', 'N/A')}")
-    print(f"  Error:       {photo_data.get('error', 'None')}")
+        logger.exception("Fatal error processing photo '%s'", os.path.basename(photo_path))
+        photo_data['error'] = f"Fatal processing error: {e}"
+    if not photo_data['error'] and not exiftool_failed: _METADATA_CACHE.put(photo_path, photo_data)
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug('--- Finished Processing: %s ---', photo_data['filename'])
+        logger.debug("  Caption:     '%s'", photo_data.get('caption', 'N/A'))
+        logger.debug('  GPS:         Lat=%s, Lon=%s', photo_data.get('latitude', 'N/A'), photo_data.get('longitude', 'N/A'))
+        logger.debug('  Orientation: %s', photo_data.get('orientation', 'N/A'))
+        logger.debug('  Dimensions:  %sx%s', photo_data.get('width', 'N/A'), photo_data.get('height', 'N/A'))
+        logger.debug('  Error:       %s', photo_data.get('error', 'None'))
     return photo_data
 
-def extract_metadata_from_photos(photo_paths):
-    """Extract metadata from multiple photos."""
-    photo_data_list = []
-    total = len(photo_paths); print(f"\nStarting metadata extraction for {total} photos...")
-    for i, photo_path in enumerate(photo_paths):
-        photo_data = extract_metadata_from_photo(photo_path)
-        photo_data_list.append(photo_data)
-    print(f"\nFinished metadata extraction for {total} photos.")
-    return photo_data_list
+def extract_metadata_from_photos(photo_paths, workers=None):
+    """Extract metadata from multiple photos, fanning out across a thread pool when there is more than one."""
+    # The same photo may be listed more than once; extract it once and copy the result for the repeats
+    requested_paths = photo_paths; photo_paths = list(dict.fromkeys(photo_paths))
+    total = len(photo_paths); logger.info('Starting metadata extraction for %s photos...', total)
+    _list_dir_names.cache_clear() # Pick up sidecars added since the previous batch
+    # Photos unchanged since an earlier run come straight from the persistent cache
+    by_path = {photo_path: _restore_cached_photo_data(photo_path, cached) for photo_path, cached in _METADATA_CACHE.get_many(photo_paths).items()}
+    uncached_paths = [photo_path for photo_path in photo_paths if photo_path not in by_path]
+    if by_path: logger.info('Using cached metadata for %s of %s photos.', len(by_path), total)
+    # One ExifTool and one mdls command for the rest of the batch; the per-photo extraction only reads the caches
+    prefetched = prefetch_metadata_bulk(uncached_paths)
+    exiftool_metadata = [prefetched.get(photo_path) for photo_path in uncached_paths]
+    # Per-photo work blocks on file I/O and helper processes, both of which release the GIL, so threads
+    # scale without pickling results back from worker processes
+    workers = min(workers or 8, len(uncached_paths))
+    if _HAS_MDLS: bulk_mdls(uncached_paths)
+    if workers > 1:
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            by_path.update(zip(uncached_paths, pool.map(_extract_uncached, uncached_paths, exiftool_metadata)))
+    else:
+        by_path.update((photo_path, _extract_uncached(photo_path, metadata)) for photo_path, metadata in zip(uncached_paths, exiftool_metadata))
+    logger.info('Finished metadata extraction for %s photos.', total)
+    if len(requested_paths) != total:
+        # Separate dicts, so editing one entry (e.g. its temp_file) doesn't change the others
+        return [dict(by_path[photo_path]) for photo_path in requested_paths]
+    return [by_path[photo_path] for photo_path in photo_paths]
+
+def _convert_heic_worker(photo_path):
+    """Process pool entry point for prepare_image_files: returns (temp_path, None) or (None, error message)."""
+    try: return _convert_heic_to_temp_jpeg(photo_path), None
+    except Exception as e: return None, str(e)
+
+def prepare_image_files(photo_data_list):
+    """Converts every HEIC photo that still needs a temporary JPG up front, across a process pool,
+    so ensure_image_file() later finds the conversions done. Decoding HEIC and re-encoding it as
+    JPEG is CPU-bound and would serialize on the GIL in threads."""
+    pending = {} # path -> photo_data entries (a photo listed twice is converted once)
+    for photo_data in photo_data_list:
+        if not photo_data.get('temp_file') and photo_data['path'].lower().endswith(_HEIC_SUFFIXES) and os.path.exists(photo_data['path']):
+            pending.setdefault(photo_data['path'], []).append(photo_data)
+    if not HEIC_SUPPORT or len(pending) < 2: return # A single conversion isn't worth starting a pool
+    cpu_count = os.cpu_count() or 1
+    logger.info('Converting %s HEIC photos to temporary JPGs...', len(pending))
+    try:
+        with ProcessPoolExecutor(max_workers=min(cpu_count, len(pending))) as pool:
+            results = pool.map(_convert_heic_worker, pending, chunksize=max(1, len(pending) // (cpu_count * 4)))
+            for entries, (temp_path, error) in zip(pending.values(), results):
+                if error: logger.error("Failed to open or convert HEIC file '%s': %s", entries[0]['filename'], error)
+                for photo_data in entries:
+                    if temp_path: photo_data['temp_file'] = temp_path
+                    else: photo_data['error'] = f"{_HEIC_ERROR}: {error}"
+    except (BrokenProcessPool, OSError) as e:
+        # Photos the pool didn't get to are converted one by one by ensure_image_file()
+        logger.error('HEIC conversion pool failed; converting the remaining photos inline: %s', e)
+
+def ensure_image_file(photo_data):
+    """Returns a path python-docx can embed, converting a HEIC photo to a temporary JPG on first use.
+    The conversion is recorded in photo_data['temp_file'] so cleanup_temp_files() removes it."""
+    if photo_data.get('temp_file'): return photo_data['temp_file']
+    if (photo_data.get('error') or '').startswith(_HEIC_ERROR): return photo_data['path'] # Already failed; don't retry
+    if HEIC_SUPPORT and photo_data['path'].lower().endswith(_HEIC_SUFFIXES) and os.path.exists(photo_data['path']):
+        _convert_heic_into(photo_data)
+    return photo_data.get('temp_file') or photo_data['path']
 
 def cleanup_temp_files(photo_data_list):
     """Clean up temporary HEIC conversion files."""
@@ -458,7 +978,8 @@ def cleanup_temp_files(photo_data_list):
     cleaned_count = 0
     for photo_data in photo_data_list:
         temp_file_path = photo_data.get('temp_file')
-        if temp_file_path and os.path.exists(temp_file_path):
-            try: os.unlink(temp_file_path); cleaned_count += 1
-            except Exception as e: print(f"ERROR: Failed to remove temp conversion file '{temp_file_path}': {str(e)}")
-    if cleaned_count > 0: print(f"Cleaned up {cleaned_count} temporary conversion files.")
\ No newline at end of file
+        if not temp_file_path: continue
+        try: os.unlink(temp_file_path); cleaned_count += 1
+        except FileNotFoundError: pass # Already removed, e.g. shared by a repeated photo
+        except OSError as e: logger.error("Failed to remove temp conversion file '%s': %s", temp_file_path, e)
+    if cleaned_count > 0: logger.info('Cleaned up %s temporary conversion files.', cleaned_count)
\ No newline at end of file